@@ -323,6 +323,8 @@ async def lifespan(app: FastAPI):
     yield
     # --- 關閉時執行的程式碼 ---
     logger.info("應用程式關閉中...")
+    if _jmx_service is not None:
+        _jmx_service.close()
     if log_service:
         log_service.add_log("INFO", "API 服務關閉")
 
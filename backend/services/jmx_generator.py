@@ -1,30 +1,273 @@
 import os
 import json
+import logging
 import threading
+import hashlib
+import functools
+import copy
+import itertools
 import re, textwrap
 import math
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
-import pandas as pd
 from ibm_watsonx_ai.foundation_models import ModelInference
 from ibm_watsonx_ai.metanames import GenTextParamsMetaNames as GenParams
 from ibm_watsonx_ai.credentials import Credentials
 from dotenv import load_dotenv
 from lxml import etree
 from lxml.builder import E
-import xml.etree.ElementTree as ET
-import xml.sax.saxutils as saxutils
-from xml.sax.saxutils import escape as saxutils_escape
 from dataclasses import asdict
 from .logger import get_logger
 from .llm_service import LLMService
 import io
 import csv
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from dataclasses import dataclass, field
 
+try:
+    import orjson
+except ImportError:  # orjson 為選用的加速套件，未安裝時退回標準函式庫 json
+    orjson = None
+
 load_dotenv()
 
+# LLM 回應中結構化模板的起始標誌
+_TEMPLATE_START_MARKER = "# ======================================================================"
+
+# 上傳的 CSV 一律視為標準格式 (逗號分隔、雙引號包覆)，直接指定 dialect，不做格式偵測
+_CSV_DIALECT = csv.excel
+
+# 產生的 JMX 中 CSV Data Set 檔案路徑的前綴 (相對於 JMX 檔案所在目錄)
+_CSV_PATH_PREFIX = "./"
+
+# orjson 會將超出 64 位元範圍的整數轉為浮點數而失去精度，含有此長度數字的內容改用標準函式庫解析
+# (19 位數即可能超出範圍，例如小於 int64 下限的負數，因此門檻設為 19 位)
+_LONG_INTEGER_RE = re.compile(r'\d{19}')
+
+# JMeter 變數參照 (如 `${userId}`)，擷取括號內的變數名稱
+_JMETER_VAR_RE = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+# 結構化需求模板的元件標頭 `[類型: 名稱]`，用於判斷內容是否為結構化模板
+_COMPONENT_HEADER_RE = re.compile(r"^\s*\[[a-zA-Z]+:.+?\]", re.MULTILINE)
+# 單行的元件標頭，擷取元件類型與名稱
+_COMPONENT_LINE_RE = re.compile(r"\[([a-zA-Z]+):\s*(.+?)\s*\]")
+
+# 參數化 JSON Body 結果的快取容量
+_PARAM_CACHE_SIZE = 128
+
+# 需求模板解析結果的快取容量
+_ANALYSIS_CACHE_SIZE = 32
+
+# LLM 回應快取容量：相同模型與相同提示詞在貪婪解碼下必定得到相同回應
+_LLM_CACHE_SIZE = 32
+
+# 執行同步 LLM 呼叫的常駐執行緒池大小，避免阻塞事件迴圈
+_LLM_EXECUTOR_WORKERS = 4
+
+def _json_constant_to_none(_constant: str) -> None:
+    """
+    `json.loads` 的 `parse_constant` 掛鉤：將 `NaN`、`Infinity`、`-Infinity` 直接解析為 None。
+    :param _constant: JSON 中出現的非標準常數字串。
+    :return: 一律返回 None。
+    """
+    return None
+
+def _parse_finite_float(literal: str) -> Optional[float]:
+    """
+    `json.loads` 的 `parse_float` 掛鉤：溢位成無限大的浮點數 (如 `1e999`) 解析為 None。
+    :param literal: JSON 中的浮點數字面值。
+    :return: 有限的浮點數，或 None。
+    """
+    value = float(literal)
+    return value if math.isfinite(value) else None
+
+def _json_loads(text: str, **fallback_kwargs) -> Any:
+    """
+    解析 JSON 字串，優先使用 C 實作的 orjson。
+
+    orjson 無法處理的內容 (未安裝、非標準常數如 `NaN`、溢位的浮點數、超過 64 位元的整數) 會退回標準函式庫 `json`，
+    因此解析結果與 `json.loads` 一致。
+    :param text: JSON 字串。
+    :param fallback_kwargs: 退回 `json.loads` 時使用的參數 (例如 `parse_constant` 掛鉤)。
+    :return: 解析後的 Python 物件。
+    :raises json.JSONDecodeError: 如果內容不是有效的 JSON。
+    """
+    if orjson is not None and not _LONG_INTEGER_RE.search(text):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text, **fallback_kwargs)
+
+def _json_dumps(obj: Any, pretty: bool = False) -> str:
+    """
+    將 Python 物件序列化為保留非 ASCII 字元的 JSON 字串，優先使用 orjson。
+    :param obj: 要序列化的 Python 物件。
+    :param pretty: 是否以縮排 2 格輸出；預設為緊湊格式 (無多餘空白)。
+    :return: JSON 字串。
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(obj, option=option).decode('utf-8')
+        except TypeError:
+            # orjson 不支援的型別 (例如超過 64 位元的整數)，退回標準函式庫
+            pass
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+def _read_first_data_row(raw_content: str) -> Optional[List[str]]:
+    """
+    讀取 CSV 內容中標頭之後的第一行資料。
+
+    前兩行不含引號與單獨的 `\r` 時直接以字串切割，否則退回 `csv.reader` 以正確處理引號包覆的欄位。
+    :param raw_content: CSV 檔案的原始內容。
+    :return: 第一行資料的欄位列表；空白行為空列表；沒有資料行則返回 None。
+    """
+    first_newline = raw_content.find('\n')
+    if first_newline == -1:
+        return None
+    start = first_newline + 1
+    if start == len(raw_content):
+        return None
+    second_newline = raw_content.find('\n', start)
+    head = raw_content[:second_newline] if second_newline != -1 else raw_content
+
+    if '"' not in head and '\r' not in head.replace('\r\n', ''):
+        line = head[start:]
+        if line.endswith('\r'):
+            line = line[:-1]
+        return line.split(',') if line else []
+
+    csv_reader = csv.reader(io.StringIO(raw_content))
+    next(csv_reader, None)  # 跳過標頭
+    return next(csv_reader, None)
+
+def _scan_csv_content(content: str) -> Tuple[List[str], List[List[str]], int]:
+    """
+    一次取得 CSV 內容的標頭、前 5 行樣本資料與資料行數。
+
+    內容不含引號與單獨的 `\r` 時，每一行就是一筆紀錄：標頭與樣本只切割開頭幾行，行數以計算換行字元取得，
+    不必逐行建立欄位列表；否則退回 `csv.reader` 以正確處理引號內的逗號與換行。
+    :param content: CSV 檔案的原始內容 (非空)。
+    :return: (原始標頭列表, 樣本資料列表, 資料行數)。
+    :raises csv.Error: 退回 `csv.reader` 時內容格式錯誤。
+    """
+    if '"' not in content and content.count('\r') == content.count('\r\n'):
+        line_count = content.count('\n') + (0 if content.endswith('\n') else 1)
+        total_data_rows = line_count - 1
+        lines = content.split('\n', 6)
+        rows = [line[:-1] if line.endswith('\r') else line for line in lines[:1 + min(5, total_data_rows)]]
+        headers, *sample_data = [line.split(',') if line else [] for line in rows]
+        return headers, sample_data, total_data_rows
+
+    csv_reader = csv.reader(io.StringIO(content), dialect=_CSV_DIALECT)
+    headers = next(csv_reader, [])
+    # 提取最多 5 行作為樣本資料，其餘資料行僅串流計數，不整份載入記憶體
+    sample_data = list(itertools.islice(csv_reader, 5))
+    return headers, sample_data, len(sample_data) + sum(1 for _ in csv_reader)
+
+@functools.lru_cache(maxsize=64)
+def _clean_llm_template_response_impl(response: str) -> Optional[str]:
+    """
+    `_clean_llm_template_response` 的純字串核心邏輯，以 LRU 快取重用相同輸入的結果。
+    :param response: 來自 LLM 的原始回應字串。
+    :return: 清理後的模板字串；如果找不到任何模板起始位置則返回 None。
+    """
+    # 尋找模板的起始標誌
+    start_index = response.find(_TEMPLATE_START_MARKER)
+
+    if start_index == -1:
+        # 如果找不到起始標誌，嘗試尋找第一個 [Component: Name]
+        match = _COMPONENT_HEADER_RE.search(response)
+        if not match:
+            return None
+        start_index = match.start()
+
+    # 從找到的起始位置截取
+    cleaned_response = response[start_index:]
+
+    # 移除結尾可能出現的 markdown
+    if cleaned_response.endswith("```"):
+        cleaned_response = cleaned_response[:-3].strip()
+
+    return cleaned_response
+
+@functools.lru_cache(maxsize=4096)
+def _java_string_hashcode(text: str) -> int:
+    """
+    計算一個字串的雜湊碼，完全模擬 Java 的 String.hashCode() 行為。
+    這對於 JMeter 內部資料結構的正確性至關重要；相同的斷言樣式常在多個請求間重複，因此以 LRU 快取結果。
+    :param text: 輸入的字串。
+    :return: 一個 32 位元帶正負號的整數雜湊碼。
+    """
+    h = 0
+    # Java 的 hashCode 公式是 h = 31 * h + c
+    # 我們使用位元運算來將結果保持在 32 位元範圍內
+    for char in text:
+        h = (31 * h + ord(char)) & 0xFFFFFFFF
+
+    # 如果最高位 (第 32 位) 是 1，在二補數表示法中它是一個負數
+    if h & 0x80000000:
+        # 從 32 位元無符號整數轉換為 32 位元帶正負號整數
+        h = h - 0x100000000
+    return h
+
+# 監聽器標準的 saveConfig 物件屬性 (定義要儲存哪些欄位)，內容固定，只在模組載入時建立一次，使用時再複製
+_SAVE_CONFIG_TEMPLATE = E.objProp(
+    E.name("saveConfig"),
+    E.value(
+        E.time("true"), E.latency("true"), E.timestamp("true"),
+        E.success("true"), E.label("true"), E.code("true"),
+        E.message("true"), E.threadName("true"), E.dataType("true"),
+        E.encoding("false"), E.assertions("true"), E.subresults("true"),
+        E.responseData("false"), E.samplerData("false"), E.xml("false"),
+        E.fieldNames("true"), E.responseHeaders("false"), E.requestHeaders("false"),
+        E.responseDataOnError("false"), E.saveAssertionResultsFailureMessage("true"),
+        E.assertionsResultsToSave("0"), E.bytes("true"), E.sentBytes("true"),
+        E.url("true"), E.threadCounts("true"), E.idleTime("true"),
+        E.connectTime("true"),
+        **{'class': "SampleSaveConfiguration"}
+    )
+)
+
+class _LRUCache:
+    """執行緒安全的簡易 LRU 快取，超過容量時淘汰最久未使用的項目"""
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        取得快取值，命中時將該項目標記為最近使用。
+        :param key: 快取鍵。
+        :param default: 未命中時返回的預設值。
+        :return: 快取值或預設值。
+        """
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key, value) -> None:
+        """
+        寫入快取值，必要時淘汰最久未使用的項目。
+        :param key: 快取鍵。
+        :param value: 快取值。
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
 @dataclass
 class CsvInfo:
     """儲存 CSV Data Set Config 的所有詳細參數"""
@@ -41,6 +284,11 @@ class CsvInfo:
     raw_content: Optional[str] = None
     total_rows: int = 0
 
+    @functools.cached_property
+    def first_data_row(self) -> Optional[List[str]]:
+        """標頭之後的第一行資料，首次存取時解析一次並快取在此物件上"""
+        return _read_first_data_row(self.raw_content or "")
+
 @dataclass
 class GlobalHttpDefaultsInfo:
     """儲存全域 HTTP Request Defaults 的設定。"""
@@ -152,6 +400,9 @@ class GenerationContext:
     listeners: List[ListenerInfo] = field(default_factory=list)
 
 class JMXGeneratorService:
+    # 參數化後的 JSON Body 是否以縮排格式輸出；JMeter 執行時不需要排版，預設輸出緊湊格式
+    PRETTY_JSON_BODY = False
+
     def __init__(self, llm_service: Optional[LLMService] = None, model_name: str = "meta-llama/llama-4-maverick-17b-128e-instruct-fp8"):
         """
         初始化 JMXGeneratorService
@@ -161,6 +412,28 @@ class JMXGeneratorService:
         self._llm_service = llm_service
         self._model_name = model_name
         self.logger = get_logger(__name__)
+        # 相同 Body 搭配相同 CSV 的參數化結果快取
+        self._param_cache = _LRUCache(_PARAM_CACHE_SIZE)
+        # 以需求模板的雜湊值為鍵，快取解析結果的 JSON 字串 (取用時重新解析，呼叫端可自由修改)
+        self._analysis_cache = _LRUCache(_ANALYSIS_CACHE_SIZE)
+        # 以 (模型名稱, 提示詞) 的雜湊值為鍵，快取 LLM 的原始回應
+        self._llm_cache = _LRUCache(_LLM_CACHE_SIZE)
+        # 服務存續期間共用的執行緒池，同步的 LLM 呼叫在此執行而不佔用事件迴圈
+        self._executor = ThreadPoolExecutor(max_workers=_LLM_EXECUTOR_WORKERS, thread_name_prefix='jmx-llm')
+
+    def close(self) -> None:
+        """
+        關閉服務持有的執行緒池，應在應用程式關閉時呼叫。
+        """
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self) -> "JMXGeneratorService":
+        """支援以 `with` 陳述式使用服務，離開區塊時自動關閉。"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """離開 `with` 區塊時關閉執行緒池。"""
+        self.close()
 
     @property
     def llm_service(self) -> LLMService:
@@ -182,17 +455,21 @@ class JMXGeneratorService:
         """
         JMX 生成流程的總指揮。
 
-        此函式協調整個流程，從理解使用者需求到最終生成並驗證 JMX 檔案。
-        它包含了轉換、準備、驗證、組裝和最終驗證等核心步驟。
+        此函式協調整個流程，從理解使用者需求到最終生成 JMX 檔案。
+        它包含了轉換、準備、驗證和組裝等核心步驟。
         :param requirements: 使用者輸入的自然語言需求。
         :param files_data: 一個包含已上傳檔案資訊的字典列表。
         :param max_retries: (目前未使用) 最大重試次數。
         :return: 一個包含最終 JMX 內容的字串。
         :raises RuntimeError: 如果 LLM 轉換步驟失敗。
-        :raises ValueError: 如果輸入資料解析失敗、資料驗證失敗或最終 JMX 結構無效。
+        :raises ValueError: 如果輸入資料解析失敗或資料驗證失敗。
         """
         self.logger.info("=== 開始執行 JMX 生成流程 ===")
 
+        # 檔案解析不依賴 LLM 的輸出，先在背景執行緒啟動，與 LLM 呼叫的網路等待時間重疊
+        loop = asyncio.get_running_loop()
+        files_future = loop.run_in_executor(None, self._safe_process_files, files_data)
+
         # 步驟 1: 強制執行 LLM 轉換
         self.logger.info("啟動 LLM 轉換，將使用者輸入統一為標準化模板...")
         final_requirements_template: str
@@ -200,66 +477,70 @@ class JMXGeneratorService:
             final_requirements_template = await self.convert_requirements_to_template(requirements, files_data)
             self.logger.info("LLM 成功將輸入轉換為結構化模板。")
         except Exception as e:
-            self.logger.error(f"LLM 轉換步驟失敗: {e}", exc_info=True)
+            files_future.cancel()
+            self.logger.error("LLM 轉換步驟失敗: %s", e, exc_info=True)
             raise RuntimeError(f"無法將您的需求轉換為可處理的格式: {e}")
 
         # 步驟 2: 準備生成上下文
         try:
-            context = self._prepare_generation_context(final_requirements_template, files_data)
-            self.logger.info(f"生成上下文準備完成，測試計畫: '{context.test_plan_name}'")
+            processed_files = await files_future
+            context = self._prepare_generation_context(final_requirements_template, files_data, processed_files)
+            self.logger.info("生成上下文準備完成，測試計畫: '%s'", context.test_plan_name)
         except ValueError as e:
-            self.logger.error(f"輸入資料準備或解析失敗: {e}", exc_info=True)
+            self.logger.error("輸入資料準備或解析失敗: %s", e, exc_info=True)
             raise e
 
         # 步驟 3: 在組裝前，驗證資料完整性
         self.logger.info("開始執行 JMX 組裝前的資料完整性驗證...")
-        for tg_context in context.thread_groups:
-            for req_info in tg_context.http_requests:
-                # 檢查條件：如果請求本身沒有 domain，且全域也沒有設定 domain
-                has_global_domain = (
-                    context.global_settings and
-                    context.global_settings.http_defaults and
-                    context.global_settings.http_defaults.domain
-                )
-                if not req_info.domain and not has_global_domain:
-                    error_msg = f"請求 '{req_info.name}' 缺少必要的伺服器位址(domain)，且未設定全域預設值。"
-                    self.logger.error(f"資料驗證失敗: {error_msg}")
-                    raise ValueError(error_msg)
+        # 全域 domain 設定在整個驗證過程中不會改變，只需計算一次
+        has_global_domain = (
+            context.global_settings and
+            context.global_settings.http_defaults and
+            context.global_settings.http_defaults.domain
+        )
+        # 有全域 domain 時每個請求必定通過檢查，可直接略過逐一走訪
+        if not has_global_domain:
+            for tg_context in context.thread_groups:
+                for req_info in tg_context.http_requests:
+                    # 檢查條件：請求本身沒有 domain (全域也沒有設定 domain)
+                    if not req_info.domain:
+                        error_msg = f"請求 '{req_info.name}' 缺少必要的伺服器位址(domain)，且未設定全域預設值。"
+                        self.logger.error("資料驗證失敗: %s", error_msg)
+                        raise ValueError(error_msg)
         self.logger.info("資料完整性驗證通過。")
 
         # 步驟 4: 使用驗證通過的 context 進行組裝
         try:
             self.logger.info("開始組裝 JMX...")
+            # JMX 由 lxml 元素樹直接序列化而成，建構時即拒絕非法字元，輸出必定是格式正確的 XML，
+            # 因此不再以 validate_xml 重新解析一次 (validate_xml 仍供 /api/validate 驗證外部內容使用)
             jmx_content = self._assemble_jmx_from_structured_data(context)
 
-            # 步驟 5: 驗證組裝後的 JMX
-            is_valid, message = self.validate_xml(jmx_content)
-            if not is_valid:
-                self.logger.error(f"JMX 組裝後驗證失敗: {message}")
-                raise ValueError(f"組裝後的 JMX 結構無效: {message}")
-
-            self.logger.info("JMX 組裝與驗證成功！")
+            self.logger.info("JMX 組裝成功！")
             return jmx_content
 
         except Exception as e:
-            self.logger.error(f"JMX 組裝過程中發生嚴重錯誤: {e}", exc_info=True)
+            self.logger.error("JMX 組裝過程中發生嚴重錯誤: %s", e, exc_info=True)
             raise Exception(f"無法生成有效的 JMX 檔案: {e}")
 
-    def _prepare_generation_context(self, requirements: str, files_data: List[Dict]) -> GenerationContext:
+    def _prepare_generation_context(self, requirements: str, files_data: List[Dict],
+                                    processed_files: Optional[Dict] = None) -> GenerationContext:
         """
         準備生成 JMX 所需的完整上下文 (Context) 物件。
 
         此函式是資料準備階段的核心，它負責將「字串」和「原始檔案」轉換為結構化的 Python 物件。
         1. 呼叫 `_analyze_requirements_dynamically` 將 LLM 生成的模板字串解析成一個包含層級關係的字典。
-        2. 呼叫 `_safe_process_files` 處理所有上傳的檔案（如 CSV、JSON）。
+        2. 呼叫 `_safe_process_files` 處理所有上傳的檔案（如 CSV、JSON）；若呼叫端已先行處理則直接使用其結果。
         3. 將解析後的字典和檔案內容，填充到預先定義好的一系列 `dataclass` 物件中。
         4. 處理關鍵邏輯，例如決定 CSV 變數名稱的優先級（優先使用模板定義，若無才用檔案標頭）。
         :param requirements: 結構化的需求模板字串。
         :param files_data: 一個包含已上傳檔案資訊的字典列表。
+        :param processed_files: 可選的 `_safe_process_files` 處理結果；為 None 時會在此處理 files_data。
         :return: 一個包含所有生成所需資訊的 GenerationContext 物件。
         """
         self.logger.info("=== 步驟 1: 開始準備生成上下文 ===")
-        processed_files = self._safe_process_files(files_data)
+        if processed_files is None:
+            processed_files = self._safe_process_files(files_data)
         req_analysis = self._analyze_requirements_dynamically(requirements)
 
         global_settings = GlobalSettings(
@@ -267,6 +548,11 @@ class JMXGeneratorService:
             headers=[GlobalHeaderInfo(**h) for h in req_analysis.get('global_headers', [])]
         )
 
+        # 檔案處理結果在整個迴圈中不會改變，先取出一次，避免在每個 ThreadGroup 中重複查找
+        # CSV 設定已以檔名為鍵，每個 CsvDataSet 以一次字典查詢取得設定
+        csv_by_filename = processed_files.get('csv_configs', {})
+        json_contents = processed_files.get('json_contents', {})
+
         thread_group_contexts = []
         for tg_data in req_analysis.get('thread_groups', []):
             tg_params = tg_data.get('params', {})
@@ -295,16 +581,14 @@ class JMXGeneratorService:
                 if not csv_filename:
                     continue
 
-                csv_info_dict = next(
-                    (csv for csv in processed_files.get('csv_configs', []) if csv.get('filename') == csv_filename),
-                    None)
+                csv_info_dict = csv_by_filename.get(csv_filename)
                 if not csv_info_dict:
-                    self.logger.warning(f"模板中定義的 CSV 檔案 '{csv_filename}' 未上傳或處理失敗，已跳過。")
+                    self.logger.warning("模板中定義的 CSV 檔案 '%s' 未上傳或處理失敗，已跳過。", csv_filename)
                     continue
 
                 # 強制使用從 CSV 檔案實際讀取的標頭作為變數名稱，忽略 LLM 模板的建議。
                 final_variable_names = csv_info_dict.get('variable_names', [])
-                self.logger.info(f"強制使用檔案標頭作為 '{csv_filename}' 的變數: {final_variable_names}")
+                self.logger.info("強制使用檔案標頭作為 '%s' 的變數: %s", csv_filename, final_variable_names)
 
                 sharing_mode_from_template = csv_params.get('sharing_mode', 'All threads').lower()
                 sharing_mode_jmeter = 'shareMode.all'
@@ -344,7 +628,7 @@ class JMXGeneratorService:
 
                 body_filename = req_params.get('body_file')
                 if body_filename:
-                    json_content_info = processed_files.get('json_contents', {}).get(body_filename)
+                    json_content_info = json_contents.get(body_filename)
                     if json_content_info:
                         http_req_info.source_json_filename = body_filename
                         # 將 JSON 檔案的原始文字內容直接存入 HttpRequestInfo 物件
@@ -381,47 +665,65 @@ class JMXGeneratorService:
         作為一個總調度函式，它會分類處理傳入的檔案列表，分別調用
         `_process_csv_files` 和 `_process_json_files`，並將結果匯總成一個字典。
         :param files_data: 一個包含已上傳檔案資訊的字典列表。
-        :return: 一個包含 'csv_configs' 和 'json_contents' 的字典。
+        :return: 一個包含 'csv_configs' 和 'json_contents' 的字典，兩者皆以檔名為鍵。
         """
         try:
             if not files_data:
                 self.logger.warning("沒有傳入任何檔案資料")
-                return {"csv_configs": [], "json_contents": {}}
+                return {"csv_configs": {}, "json_contents": {}}
 
-            self.logger.info(f"開始處理 {len(files_data)} 個檔案")
+            self.logger.info("開始處理 %s 個檔案", len(files_data))
 
             # 從 _process_csv_files 獲取的是字典，key 是檔名
             csv_configs_dict = self._process_csv_files(files_data)
             json_contents = self._process_json_files(files_data)
 
-            self.logger.info(f"JSON 處理結果: {list(json_contents.keys())}")
+            self.logger.info("JSON 處理結果: %s", list(json_contents.keys()))
 
-            # 將 CSV configs 字典轉換為列表格式，並確保包含 raw_content
-            csv_configs_list = []
+            # 保留以檔名為鍵的結構，呼叫端可直接以檔名查詢，並確保包含 raw_content
+            csv_configs = {}
             for filename, config in csv_configs_dict.items():
                 if config and 'error' not in config:
                     # 確保我們從 _safe_process_single_csv 返回的所有重要資訊都被包含
-                    csv_configs_list.append({
-                        'filename': filename,
+                    csv_configs[filename] = {
                         'variable_names': config.get('headers', []),
                         'total_rows': config.get('total_rows', 0),
                         'filepath': config.get('filepath', filename),
                         'raw_content': config.get('raw_content', '')  # 確保 raw_content 被傳遞
-                    })
+                    }
                     self.logger.info(
-                        f"為列表添加 CSV 設定: '{filename}', 變數: {config.get('headers', [])}, raw_content 長度: {len(config.get('raw_content', ''))}")
+                        "添加 CSV 設定: '%s', 變數: %s, raw_content 長度: %d",
+                        filename, config.get('headers', []), len(config.get('raw_content', '')))
                 else:
-                    self.logger.warning(f"跳過有問題的 CSV 設定: {filename}")
+                    self.logger.warning("跳過有問題的 CSV 設定: %s", filename)
 
-            result = {"csv_configs": csv_configs_list, "json_contents": json_contents}
-            self.logger.info(f"檔案處理完成 - CSV: {len(csv_configs_list)}, JSON: {len(json_contents)}")
+            result = {"csv_configs": csv_configs, "json_contents": json_contents}
+            self.logger.info("檔案處理完成 - CSV: %s, JSON: %s", len(csv_configs), len(json_contents))
             return result
 
         except Exception as e:
-            self.logger.error(f"檔案處理失敗: {e}", exc_info=True)
-            return {"csv_configs": [], "json_contents": {}}
+            self.logger.error("檔案處理失敗: %s", e, exc_info=True)
+            return {"csv_configs": {}, "json_contents": {}}
 
     def _analyze_requirements_dynamically(self, requirements: str) -> dict:
+        """
+        解析結構化的需求模板字串，相同模板直接重用先前的解析結果。
+
+        解析結果是巢狀字典且會被後續流程修改，因此快取中保存的是其 JSON 字串，每次取用都還原成全新的字典。
+        :param requirements: 結構化的需求模板字串。
+        :return: 一個代表整個測試計畫結構的巢狀字典。
+        """
+        cache_key = hashlib.blake2b(requirements.encode('utf-8'), digest_size=16).digest()
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("使用快取的需求模板解析結果")
+            return _json_loads(cached)
+
+        analysis = self._analyze_requirements_uncached(requirements)
+        self._analysis_cache.put(cache_key, _json_dumps(analysis))
+        return analysis
+
+    def _analyze_requirements_uncached(self, requirements: str) -> dict:
         """
         動態解析結構化的需求模板字串，並建立元件之間的層級關係。
 
@@ -432,7 +734,7 @@ class JMXGeneratorService:
         :return: 一個代表整個測試計畫結構的巢狀字典。
         """
         self.logger.info("================== 開始執行解析器 ==================")
-        is_structured_format = re.search(r"^\s*\[[a-zA-Z]+:.+?\]", requirements, re.MULTILINE)
+        is_structured_format = _COMPONENT_HEADER_RE.search(requirements)
 
         if not is_structured_format:
             self.logger.warning("未偵測到結構化模板格式，退回。")
@@ -445,16 +747,29 @@ class JMXGeneratorService:
 
         # --- 第一階段：將模板字串解析為一個扁平的元件列表 ---
         all_components = []
-        # 使用正規表示式尋找所有 [Component: Name] 區塊
-        for match in re.finditer(r"\[([a-zA-Z]+):\s*(.+?)\]\n([\s\S]+?)(?=\n\[|\Z)", requirements, re.MULTILINE):
-            comp_type, comp_name, comp_body = match.groups()
-            component = {'type': comp_type.strip(), 'name': comp_name.strip(), 'params': {}}
+        # 逐行掃描一次模板：`[Type: Name]` 開始一個新元件，其後的 `key = value` 行歸屬於目前元件
+        component = None
+        for line in requirements.splitlines():
+            stripped = line.strip()
+            if stripped.startswith('['):
+                # 不合格的標頭會結束目前區塊，其後的參數在下一個合格標頭出現前都會被忽略
+                header_match = _COMPONENT_LINE_RE.fullmatch(stripped)
+                component = None
+                if header_match:
+                    comp_type, comp_name = header_match.groups()
+                    component = {'type': comp_type, 'name': comp_name, 'params': {}}
+                    all_components.append(component)
+                continue
 
-            # 解析每個區塊內的 key = value 參數
-            for param_match in re.finditer(r"^\s*([^#\s=]+?)\s*=\s*(.+?)\s*$", comp_body, re.MULTILINE):
-                key, value = param_match.groups()
-                component['params'][key.strip()] = value.strip().strip('\'"')
+            if component is None or not stripped or stripped.startswith('#'):
+                continue
+            key, sep, value = stripped.partition('=')
+            key, value = key.strip(), value.strip()
+            # 參數名稱不可包含空白或 `#`，且必須有值
+            if sep and key and value and '#' not in key and len(key.split()) == 1:
+                component['params'][key] = value.strip('\'"')
 
+        for component in all_components:
             # 為容器類型的元件預先初始化子列表，方便後續附加
             if component['type'] == 'ThreadGroup':
                 component.setdefault('http_requests', [])
@@ -465,18 +780,24 @@ class JMXGeneratorService:
                 component.setdefault('tg_level_assertions', [])  # 用於暫存執行緒群組層級的斷言
             elif component['type'] == 'HttpRequest':
                 component.setdefault('assertions', [])
-            all_components.append(component)
 
-        # 建立一個以元件名稱為鍵的字典，方便快速查找父元件
-        component_map = {}
+        # 依元件名稱與類型建立索引，讓父元件解析只需字典查詢 (同名時保留第一個出現的元件)
+        # container_by_name: 可作為父層的 TestPlan / ThreadGroup；request_by_name: 可掛載斷言的 HttpRequest
+        component_names = set()
+        container_by_name = {}
+        request_by_name = {}
+        test_plan_comp = None
         for comp in all_components:
-            name = comp['name']
-            if name not in component_map:
-                component_map[name] = []
-            component_map[name].append(comp)
+            name, comp_type = comp['name'], comp['type']
+            component_names.add(name)
+            if comp_type in ('TestPlan', 'ThreadGroup'):
+                container_by_name.setdefault(name, comp)
+                if comp_type == 'TestPlan' and test_plan_comp is None:
+                    test_plan_comp = comp
+            elif comp_type == 'HttpRequest':
+                request_by_name.setdefault(name, comp)
 
         # --- 第二階段：遍歷扁平列表，建立元件之間的層級關係 ---
-        test_plan_comp = next((c for c in all_components if c['type'] == 'TestPlan'), None)
         if not test_plan_comp:
             raise ValueError("模板中未找到 [TestPlan: ...] 元件。")
 
@@ -493,22 +814,19 @@ class JMXGeneratorService:
             # 根據 'parent' 屬性尋找父元件
             parent_name = comp.get('params', {}).get('parent')
             if not parent_name:
-                self.logger.warning(f"元件 '{comp['name']}' 缺少 'parent' 屬性，已跳過。")
+                self.logger.warning("元件 '%s' 缺少 'parent' 屬性，已跳過。", comp['name'])
                 continue
 
-            parent_candidates = component_map.get(parent_name)
-            if not parent_candidates:
-                self.logger.warning(f"元件 '{comp['name']}' 找不到父層 '{parent_name}'，已跳過。")
+            if parent_name not in component_names:
+                self.logger.warning("元件 '%s' 找不到父層 '%s'，已跳過。", comp['name'], parent_name)
                 continue
 
-            # 確定唯一的父元件實體
-            parent_comp = next((p for p in parent_candidates if p['type'] in ['TestPlan', 'ThreadGroup']), None)
-            if not parent_comp:
-                parent_comp = next((p for p in parent_candidates if p['type'] == 'HttpRequest'), None)
+            # 確定唯一的父元件實體：容器類型優先，其次才是 HttpRequest
+            parent_comp = container_by_name.get(parent_name) or request_by_name.get(parent_name)
 
             if not parent_comp:
                 self.logger.warning(
-                    f"元件 '{comp['name']}' 雖然找到了名為 '{parent_name}' 的候選父元件，但它們的類型不適合做為父層，已跳過。")
+                    "元件 '%s' 雖然找到了名為 '%s' 的候選父元件，但它們的類型不適合做為父層，已跳過。", comp['name'], parent_name)
                 continue
 
             comp_type, parent_type = comp['type'], parent_comp['type']
@@ -555,7 +873,7 @@ class JMXGeneratorService:
                     parent_comp['listeners'].append(listener_params)
                 elif comp_type == 'ResponseAssertion':
                     # 處理執行緒群組層級的斷言：先暫存
-                    self.logger.info(f"發現一個執行緒群組層級的斷言 '{comp['name']}'，將其暫存。")
+                    self.logger.info("發現一個執行緒群組層級的斷言 '%s'，將其暫存。", comp['name'])
                     rule = comp['params'].get('pattern_matching_rule', 'Contains')
                     patterns = [v for k, v in comp['params'].items() if k.startswith('pattern_')]
                     possible_rules = {'contains', 'matches', 'equals', 'substring', 'not', 'or'}
@@ -600,25 +918,64 @@ class JMXGeneratorService:
                 assertions_to_add = tg_comp['tg_level_assertions']
                 if assertions_to_add and tg_comp['http_requests']:
                     self.logger.info(
-                        f"在 ThreadGroup '{tg_comp['name']}' 中找到 {len(assertions_to_add)} 個全域斷言，準備附加到 {len(tg_comp['http_requests'])} 個請求中。")
+                        "在 ThreadGroup '%s' 中找到 %d 個全域斷言，準備附加到 %d 個請求中。",
+                        tg_comp['name'], len(assertions_to_add), len(tg_comp['http_requests']))
                     for http_request in tg_comp['http_requests']:
                         for assertion in assertions_to_add:
                             # 使用 .copy() 確保每個請求獲得的是獨立的斷言字典副本
                             http_request['assertions'].append(assertion.copy())
                 elif assertions_to_add:
                     self.logger.warning(
-                        f"ThreadGroup '{tg_comp['name']}' 有 {len(assertions_to_add)} 個全域斷言，但其下沒有任何 HTTP 請求可附加。")
+                        "ThreadGroup '%s' 有 %d 個全域斷言，但其下沒有任何 HTTP 請求可附加。",
+                        tg_comp['name'], len(assertions_to_add))
 
         self.logger.info("================== 需求解析器執行完畢 ==================")
-        self.logger.debug(f"最終解析結果: {json.dumps(analysis, indent=2, ensure_ascii=False)}")
+        # 整份解析結果的縮排序列化成本不低，只在實際輸出 DEBUG 日誌時才執行
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("最終解析結果: %s", _json_dumps(analysis, pretty=True))
         return analysis
 
+    def _select_files_by_extension(self, files_data: List[Dict], extension: str) -> List[Tuple[str, Dict]]:
+        """
+        從檔案列表中篩選出指定副檔名的檔案。
+        :param files_data: 一個檔案字典的列表。
+        :param extension: 要篩選的副檔名 (小寫，包含 `.`)，例如 '.csv'。
+        :return: 一個 (檔名, 檔案字典) 元組的列表，順序與輸入一致。
+        """
+        selected = []
+        for file_info in files_data:
+            # 兼容不同前端傳入的檔名 key
+            filename = file_info.get('filename', file_info.get('name', ''))
+            if filename and filename.lower().endswith(extension):
+                selected.append((filename, file_info))
+        return selected
+
+    def _run_file_processor(self, processor, file_infos: List[Dict]) -> List[Optional[Dict]]:
+        """
+        對多個檔案依序執行同一個單檔解析函式，單一檔案的失敗不會影響其他檔案。
+
+        CSV/JSON 解析皆在持有 GIL 的情況下執行，以執行緒並行無法加速，因此直接依序處理。
+        :param processor: 單檔解析函式，例如 `_safe_process_single_csv`。
+        :param file_infos: 要解析的檔案字典列表。
+        :return: 每個檔案的解析結果列表，順序與輸入一致，失敗的檔案為 None。
+        """
+        results = []
+        for file_info in file_infos:
+            try:
+                results.append(processor(file_info))
+            except Exception as e:
+                # 捕獲意外錯誤，確保一個檔案的失敗不會影響其他檔案
+                filename_for_log = file_info.get('filename', '未知檔案')
+                self.logger.error("處理檔案 '%s' 時發生未預期錯誤: %s", filename_for_log, e, exc_info=True)
+                results.append(None)
+        return results
+
     def _process_csv_files(self, files_data: List[Dict]) -> Dict[str, Dict]:
         """
         處理所有上傳的 CSV 檔案。
 
-        此函式迭代所有傳入的檔案資料，篩選出 CSV 檔案，
-        並呼叫 `_safe_process_single_csv` 進行單一檔案的解析。
+        此函式從所有傳入的檔案資料中篩選出 CSV 檔案，
+        並透過 `_run_file_processor` 呼叫 `_safe_process_single_csv` 進行單一檔案的解析。
         :param files_data: 一個檔案字典的列表。
         :return: 一個以檔名為鍵，檔案詳細資訊為值的字典。
         """
@@ -628,25 +985,17 @@ class JMXGeneratorService:
             return csv_configs
 
         self.logger.info(f"開始處理 {len(files_data)} 個檔案中的 CSV 檔案...")
-        for file_info in files_data:
-            try:
-                # 兼容不同前端傳入的檔名 key
-                filename = file_info.get('filename', file_info.get('name', ''))
-                if not filename or not filename.lower().endswith('.csv'):
-                    continue
-
-                self.logger.info(f"發現 CSV 檔案: '{filename}'，進行解析...")
-                config = self._safe_process_single_csv(file_info)
-                if config:
-                    # 使用檔名作為 key，方便後續快速查找
-                    csv_configs[filename] = config
-                else:
-                    self.logger.warning(f"檔案 '{filename}' 解析失敗或為空，已跳過。")
-
-            except Exception as e:
-                # 捕獲迴圈中的意外錯誤，確保一個檔案的失敗不會影響其他檔案
-                filename_for_log = file_info.get('filename', '未知檔案')
-                self.logger.error(f"處理檔案 '{filename_for_log}' 時發生未預期錯誤: {e}", exc_info=True)
+        csv_files = self._select_files_by_extension(files_data, '.csv')
+        for filename, _ in csv_files:
+            self.logger.info(f"發現 CSV 檔案: '{filename}'，進行解析...")
+
+        results = self._run_file_processor(self._safe_process_single_csv, [info for _, info in csv_files])
+        for (filename, _), config in zip(csv_files, results):
+            if config:
+                # 使用檔名作為 key，方便後續快速查找
+                csv_configs[filename] = config
+            else:
+                self.logger.warning(f"檔案 '{filename}' 解析失敗或為空，已跳過。")
 
         self.logger.info(f"CSV 檔案處理完成，共成功解析 {len(csv_configs)} 個檔案。")
         return csv_configs
@@ -674,31 +1023,10 @@ class JMXGeneratorService:
                 self.logger.warning(f"CSV 檔案 '{filename}' 內容為空。")
                 return None
 
-            # 使用 io.StringIO 將字串內容模擬成一個檔案，以便 csv 模組可以讀取
-            file_stream = io.StringIO(content_str)
-
-            # 使用 csv.reader 進行解析，這是處理 CSV 的標準做法
-            csv_reader = csv.reader(file_stream)
-
-            # 讀取第一行作為標頭
-            try:
-                headers = next(csv_reader)
-                # 清理標頭，去除前後空格和空字串
-                cleaned_headers = [h.strip() for h in headers if h and h.strip()]
-            except StopIteration:
-                # 檔案為空，沒有任何行
-                self.logger.warning(f"CSV 檔案 '{filename}' 為空，無法讀取標頭。")
-                return {
-                    'headers': [], 'sample_data': [], 'total_rows': 0,
-                    'filepath': filename, 'raw_content': content_str
-                }
-
-            # 讀取剩餘的所有資料行
-            data_rows = list(csv_reader)
-            total_data_rows = len(data_rows)
-
-            # 提取最多 5 行作為樣本資料
-            sample_data = data_rows[:5]
+            # 讀取第一行作為標頭，並取得樣本資料與資料行數
+            headers, sample_data, total_data_rows = _scan_csv_content(content_str)
+            # 清理標頭，去除前後空格和空字串 (單次走訪完成 strip 與過濾)
+            cleaned_headers = [h for h in (x.strip() for x in headers) if h]
 
             self.logger.info(
                 f"CSV 解析成功: '{filename}' -> 標頭: {cleaned_headers}, 資料行數: {total_data_rows}"
@@ -723,8 +1051,8 @@ class JMXGeneratorService:
         """
         處理所有上傳的 JSON 檔案。
 
-        此函式迭代所有傳入的檔案資料，篩選出 JSON 檔案，
-        並呼叫 `_safe_process_single_json` 進行單一檔案的解析。
+        此函式從所有傳入的檔案資料中篩選出 JSON 檔案，
+        並透過 `_run_file_processor` 呼叫 `_safe_process_single_json` 進行單一檔案的解析。
         :param files_data: 一個檔案字典的列表。
         :return: 一個以檔名為鍵，檔案詳細資訊為值的字典。
         """
@@ -733,19 +1061,11 @@ class JMXGeneratorService:
         if not files_data:
             return json_contents
 
-        for file_info in files_data:
-            try:
-                filename = file_info.get('filename', file_info.get('name', ''))
-                if not filename or not filename.lower().endswith('.json'):
-                    continue
-
-                content = self._safe_process_single_json(file_info)
-                if content:
-                    json_contents[filename] = content
-
-            except Exception as e:
-                self.logger.error(f"處理 JSON 檔案 {filename} 失敗: {e}")
-                json_contents[filename] = {'error': str(e), 'raw_content': '', 'variables': []}
+        json_files = self._select_files_by_extension(files_data, '.json')
+        results = self._run_file_processor(self._safe_process_single_json, [info for _, info in json_files])
+        for (filename, _), content in zip(json_files, results):
+            if content:
+                json_contents[filename] = content
 
         return json_contents
 
@@ -791,18 +1111,23 @@ class JMXGeneratorService:
             # 🎯 確保是有效的JSON格式
             self.logger.info(f"原始內容前100字符: {content[:100]}")
 
-            # 嘗試解析 JSON
+            # 嘗試解析 JSON，並在解析當下就將 NaN / Infinity 清理為 None，避免後續再走訪一次整棵樹
             parsed_json = None
             try:
-                parsed_json = json.loads(content)
+                # 標準 JSON 由 orjson 解析；含 NaN / Infinity / 溢位數值時 orjson 會拒絕，改由標準函式庫搭配掛鉤處理
+                parsed_json = _json_loads(
+                    content,
+                    parse_constant=_json_constant_to_none,
+                    parse_float=_parse_finite_float
+                )
                 self.logger.info(f"JSON 解析成功")
             except json.JSONDecodeError as e:
                 self.logger.warning(f"JSON 解析失敗，保留原始內容: {e}")
                 # 如果不是有效JSON，仍然保留原始內容
 
-            # 清理和提取變數
-            cleaned_json = self._clean_json_values(parsed_json) if parsed_json else None
-            variables = self._extract_json_variables(cleaned_json) if cleaned_json else []
+            # 提取變數：僅在內容為有效且非空的 JSON 時，直接掃描原始文字
+            cleaned_json = parsed_json if parsed_json else None
+            variables = self._extract_json_variables(content) if cleaned_json else []
 
             result = {
                 'raw_content': content,
@@ -829,99 +1154,114 @@ class JMXGeneratorService:
             return None
 
         if isinstance(data, dict):
-            return json.dumps(data, ensure_ascii=False, indent=2)
+            return _json_dumps(data, pretty=True)
         elif isinstance(data, str):
             return data
         else:
             return str(data)
 
-    def _clean_json_values(self, obj):
-        """
-        遞迴地清理一個 Python 物件（通常來自解析後的 JSON）中的無效值。
-
-        主要用於將 `float` 類型的 `NaN` 或 `Infinity` 值轉換為 `None`，以避免後續 JSON 序列化失敗。
-        :param obj: 要清理的 Python 物件 (字典、列表等)。
-        :return: 清理後的物件。
+    def _extract_json_variables(self, raw_content: Optional[str]) -> List[str]:
         """
-        if isinstance(obj, dict):
-            return {key: self._clean_json_values(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [self._clean_json_values(item) for item in obj]
-        elif isinstance(obj, float):
-            if math.isnan(obj) or math.isinf(obj):
-                return None
-            return obj
-        else:
-            return obj
+        從 JSON 原始文字中提取所有 JMeter 風格的變數名稱。
 
-    def _extract_json_variables(self, json_obj) -> List[str]:
+        變數參照是純文字語法，直接以預先編譯的正規表示式掃描原始字串一次，不需走訪解析後的物件樹。
+        只收集 `${識別字}` 形式的變數，`${__P(...)}` 等 JMeter 函式不會被視為變數。
+        :param raw_content: JSON 檔案的原始文字內容。
+        :return: 一個依首次出現順序排列、不重複的變數名列表。
         """
-        遞迴地從一個 Python 物件中提取所有 JMeter 風格的變數名稱。
-
-        它會尋找所有形如 `${...}` 的字串值，並將括號內的變數名收集到一個列表中。
-        :param json_obj: 解析後的 JSON 物件 (字典或列表)。
-        :return: 一個包含所有變數名的列表。
-        """
-        if json_obj is None:
+        if not raw_content or '${' not in raw_content:
             return []
+        return list(dict.fromkeys(_JMETER_VAR_RE.findall(raw_content)))
 
-        variables = []
-
-        def extract_vars(obj):
-            try:
-                if isinstance(obj, dict):
-                    for key, value in obj.items():
-                        if isinstance(value, str) and value.startswith('${') and value.endswith('}'):
-                            var_name = value[2:-1]
-                            if var_name and var_name not in variables:
-                                variables.append(var_name)
-                        elif isinstance(value, (dict, list)):
-                            extract_vars(value)
-                elif isinstance(obj, list):
-                    for item in obj:
-                        extract_vars(item)
-            except Exception as e:
-                self.logger.warning(f"提取變數時發生錯誤: {e}")
-
-        extract_vars(json_obj)
-        return variables
-
-    def validate_xml(self, xml_content: str) -> Tuple[bool, str]:
+    def validate_xml(self, xml_content: Union[str, bytes]) -> Tuple[bool, str]:
         """
         一個品質保證函式，用於驗證最終生成的 JMX 字串是否為有效的 XML。
 
         在將最終的 JMX 內容返回給使用者之前，它會使用 Python 的 XML 解析器嘗試解析一次。
         如果解析成功，代表 XML 格式正確；如果失敗，則能提前捕獲錯誤。
-        :param xml_content: 要驗證的 XML 字串。
+        :param xml_content: 要驗證的 XML 字串，或已編碼為 UTF-8 的位元組。
         :return: 一個元組 (布林值, 訊息)，布林值表示是否有效，訊息為驗證結果。
         """
         try:
-            if not xml_content or not xml_content.strip():
+            # 先做不需配置新字串的廉價檢查，確認有內容後才轉換
+            if not xml_content or xml_content.isspace():
                 return False, "XML content is empty or whitespace."
 
-            content = xml_content.strip()
-            if not content.startswith('<?xml'):
+            # lxml (libxml2) 只接受不含編碼宣告的 str，因此只編碼一次為 UTF-8 位元組，
+            # 後續的前後綴檢查與解析都直接使用同一份位元組
+            # str 需在編碼前去除空白，才能一併去除 NBSP、全形空白 (U+3000) 等 Unicode 空白字元
+            is_text = not isinstance(xml_content, bytes)
+            content_bytes = xml_content.strip().encode('utf-8') if is_text else xml_content.strip()
+            if not content_bytes.startswith(b'<?xml'):
                 return False, "Validation failed: Missing XML declaration '<?xml ...?>'."
-            if not content.endswith('</jmeterTestPlan>'):
+            if not content_bytes.endswith(b'</jmeterTestPlan>'):
                 return False, "Validation failed: Content does not end with '</jmeterTestPlan>'."
 
-            open_tags = content.count('<hashTree>')
-            close_tags = content.count('</hashTree>')
-            if open_tags != close_tags:
-                return False, f"Validation failed: Mismatched <hashTree> tags (open: {open_tags}, close: {close_tags})."
-
-            ET.fromstring(content)
+            # 標籤是否成對 (例如 <hashTree>) 由下方的 XML 解析保證，不需再另外逐一計數
+            # 以 iterparse 串流走訪一次即可確認格式正確，不需保留整棵 DOM 樹；
+            # 每個元素結束後立即清除它以及已處理完的兄弟節點，讓峰值記憶體不隨文件大小成長。
+            # huge_tree 解除 libxml2 對超大文字節點與深層巢狀的安全上限，避免大型 Body 的 JMX 被誤判為無效
+            # 由 str 編碼而來的位元組必定是 UTF-8，需覆寫文件中的 encoding 宣告 (例如 UTF-16、ISO-8859-1)，
+            # 否則 libxml2 會依宣告以錯誤的編碼解讀內容；位元組輸入則仍依其宣告解析
+            parse_encoding = 'utf-8' if is_text else None
+            for _, elem in etree.iterparse(io.BytesIO(content_bytes), events=('end',), huge_tree=True,
+                                           encoding=parse_encoding):
+                elem.clear()
+                # 根元素沒有父節點，其前方的兄弟可能是註解或處理指令 (PI)，不需也無法刪除
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
             self.logger.info("XML 結構驗證通過。")
             return True, "XML validation successful."
 
-        except ET.ParseError as e:
-            error_line = str(e).split(',')[1].strip() if ',' in str(e) else str(e)
+        except etree.XMLSyntaxError as e:
+            error_line = e.msg or str(e)
             self.logger.error(f"XML 驗證失敗: 語法解析錯誤 -> {error_line}", exc_info=True)
             return False, f"XML ParseError: The generated XML is not well-formed. Details: {error_line}"
         except Exception as e:
             self.logger.error(f"XML 驗證過程中發生未預期的錯誤: {e}", exc_info=True)
             return False, f"An unexpected error occurred during XML validation: {str(e)}"
 
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _clean_csv_value(value) -> str:
+        """
+        清理單一 CSV 儲存格的值：僅去除前後空白，儲存格內容 (包含 `none`、`null` 等文字與引號) 原樣保留。
+
+        結果只取決於輸入值，以 LRU 快取重用重複出現的儲存格 (如狀態碼、列舉值)。
+        :param value: CSV 儲存格的原始值。
+        :return: 去除前後空白後的字串；空白儲存格為空字串。
+        """
+        return str(value).strip()
+
+    @staticmethod
+    def _may_match_csv(json_body: str, variable_set: set, value_map: Dict[str, str]) -> bool:
+        """
+        以子字串搜尋判斷 JSON Body 是否有可能被參數化。
+
+        只有在能確定不會命中任何鍵或值時才返回 False：Body 含有跳脫字元、
+        或對應值為數字的字串表示 (JSON 原文可能寫法不同，如 `1e2`) 時一律返回 True。
+        :param json_body: 原始的 JSON Body 字串。
+        :param variable_set: CSV 變數名集合。
+        :param value_map: 「值 -> ${變數}」的對應字典。
+        :return: 若可能發生替換則為 True。
+        """
+        if '\\' in json_body:
+            return True
+        for variable in variable_set:
+            if variable in json_body:
+                return True
+        for value in value_map:
+            if value in json_body or value.lower() in json_body:
+                return True
+            try:
+                float(value)
+            except ValueError:
+                continue
+            return True
+        return False
+
     def _parameterize_json_body(self, json_body: str, csv_info: CsvInfo) -> str:
         """
         智慧地將 JSON Body 內容參數化。
@@ -940,82 +1280,47 @@ class JMXGeneratorService:
             self.logger.warning("JSON Body 或 CSV 內容/變數為空，跳過參數化。")
             return json_body or ""
 
+        # 參數化只依賴 Body、CSV 變數名與第一行資料 (已快取於 CsvInfo)，不必對整份 CSV 內容計算雜湊
+        first_data_row = csv_info.first_data_row
+        cache_key = (
+            hashlib.blake2b(json_body.encode('utf-8'), digest_size=16).digest(),
+            csv_info.filename,
+            tuple(csv_info.variable_names),
+            None if first_data_row is None else tuple(first_data_row),
+        )
+        cached = self._param_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("使用快取的參數化結果，來源 CSV: '%s'", csv_info.filename)
+            return cached
+
+        parameterized_body = self._parameterize_json_body_uncached(json_body, csv_info)
+        self._param_cache.put(cache_key, parameterized_body)
+        return parameterized_body
+
+    def _parameterize_json_body_uncached(self, json_body: str, csv_info: CsvInfo) -> str:
+        """
+        `_parameterize_json_body` 的實際參數化邏輯，不經過快取。
+        :param json_body: 原始的 JSON Body 字串。
+        :param csv_info: 包含 CSV 變數和內容的 CsvInfo 物件。
+        :return: 參數化後的 JSON Body 字串。
+        """
         try:
-            # 步驟 1: 解析 JSON 字串為 Python 物件
-            data_obj = json.loads(json_body)
-
-            # 步驟 2: 準備兩種替換策略所需的資料
-            # 策略一：建立一個高效的 CSV 變數名集合 (用於鍵匹配)
-            variable_set = set(csv_info.variable_names)
-
-            # 策略二：從 CSV 讀取第一行資料，建立 "值 -> ${變數}" 的對應字典 (用於值匹配)
-            file_stream = io.StringIO(csv_info.raw_content)
-            csv_reader = csv.reader(file_stream)
-            next(csv_reader, None)  # 跳過標頭
-            first_data_row = next(csv_reader, None)
-
-            value_to_placeholder_map = {}
-            if first_data_row:
-                value_to_placeholder_map = {
-                    value.strip(): f"${{{variable}}}"
-                    for variable, value in zip(csv_info.variable_names, first_data_row)
-                    if value and value.strip()
-                }
-                self.logger.info(f"建立的「值」替換對應表: {value_to_placeholder_map}")
-            else:
-                self.logger.warning(f"CSV '{csv_info.filename}' 中沒有資料行，無法使用「值匹配」策略。")
-
-            # 使用一個 list 來追蹤被替換的鍵和原因
-            replacements_made = []
-
-            # 步驟 3: 定義一個遞迴函式來走訪並執行雙重替換策略
-            def recursive_replace(obj):
-                if isinstance(obj, dict):
-                    # 使用 list(obj.keys()) 來避免在迭代期間修改字典的問題
-                    for key in list(obj.keys()):
-                        value = obj[key]
-
-                        # --- 策略一：優先進行「鍵」匹配 ---
-                        if key in variable_set:
-                            placeholder = f"${{{key}}}"
-                            if obj[key] != placeholder:
-                                obj[key] = placeholder
-                                replacements_made.append(f"'{key}' (鍵匹配)")
-                            # 鍵匹配成功後，跳過對該鍵值的後續處理
-                            continue
-
-                        # --- 策略二：如果鍵不匹配，則嘗試「值」匹配 ---
-                        str_value = str(value)
-                        if str_value in value_to_placeholder_map:
-                            placeholder = value_to_placeholder_map[str_value]
-                            if obj[key] != placeholder:
-                                obj[key] = placeholder
-                                replacements_made.append(f"'{key}' (值匹配)")
-                            # 值匹配成功後，也跳過遞迴
-                            continue
-
-                        # --- 如果都沒有匹配，則遞迴深入 ---
-                        if isinstance(value, (dict, list)):
-                            recursive_replace(value)
-
-                elif isinstance(obj, list):
-                    for item in obj:
-                        recursive_replace(item)
-
-            # 執行遞迴替換
-            recursive_replace(data_obj)
-
-            if replacements_made:
-                # 使用 set 去除重複項，然後再轉回 list
-                unique_replacements = sorted(list(set(replacements_made)))
-                self.logger.info(f"JSON Body 參數化成功！已替換的欄位: {unique_replacements}")
-            else:
+            value_to_placeholder_map = self._build_value_placeholder_map(csv_info)
+
+            # 預先檢查：若 Body 原文中完全找不到任何變數名或對應值，則不可能發生替換，直接略過解析與序列化
+            if not self._may_match_csv(json_body, set(csv_info.variable_names), value_to_placeholder_map):
                 self.logger.warning(
                     "JSON Body 內容未發生變化。請檢查 JSON 的鍵名或值是否能對應到 CSV 的變數。")
+                return json_body
+
+            data_obj = _json_loads(json_body)
+            if not self._parameterize_obj_in_place(data_obj, csv_info, value_to_placeholder_map):
+                # 沒有任何欄位被替換時與預先檢查一致，原樣返回使用者的 Body，不重新序列化改變其格式
+                return json_body
 
-            # 步驟 4: 將修改後的 Python 物件序列化回格式化的 JSON 字串
-            parameterized_body = json.dumps(data_obj, indent=4, ensure_ascii=False)
-            self.logger.debug(f"參數化後的 Body: \n{parameterized_body}")
+            # 將修改後的 Python 物件序列化回 JSON 字串 (預設為緊湊格式)
+            parameterized_body = _json_dumps(data_obj, pretty=self.PRETTY_JSON_BODY)
+            self.logger.debug("參數化後的 Body: \n%s", parameterized_body)
             return parameterized_body
 
         except json.JSONDecodeError:
@@ -1025,6 +1330,94 @@ class JMXGeneratorService:
             self.logger.error(f"參數化過程中發生未預期的錯誤: {e}", exc_info=True)
             return json_body
 
+    def _build_value_placeholder_map(self, csv_info: CsvInfo) -> Dict[str, str]:
+        """
+        從 CSV 第一行資料建立「值 -> ${變數}」的對應字典 (用於值匹配策略)。
+        :param csv_info: 包含 CSV 變數和內容的 CsvInfo 物件。
+        :return: 值與變數佔位符的對應字典；沒有資料行時為空字典。
+        """
+        first_data_row = csv_info.first_data_row
+        if not first_data_row:
+            self.logger.warning("CSV '%s' 中沒有資料行，無法使用「值匹配」策略。", csv_info.filename)
+            return {}
+
+        value_to_placeholder_map = {
+            cleaned: f"${{{variable}}}"
+            for variable, value in zip(csv_info.variable_names, first_data_row)
+            if (cleaned := self._clean_csv_value(value))
+        }
+        self.logger.info("建立的「值」替換對應表: %s", value_to_placeholder_map)
+        return value_to_placeholder_map
+
+    def _parameterize_obj_in_place(self, data_obj: Any, csv_info: CsvInfo,
+                                   value_to_placeholder_map: Optional[Dict[str, str]] = None) -> bool:
+        """
+        直接在已解析的 JSON 物件上執行雙重替換策略，不經過 JSON 字串的解析與序列化。
+        :param data_obj: 已解析的 JSON 物件 (字典或列表)，會被就地修改。
+        :param csv_info: 包含 CSV 變數和內容的 CsvInfo 物件。
+        :param value_to_placeholder_map: 預先建立的「值 -> ${變數}」對應字典；為 None 時自動建立。
+        :return: 是否有任何欄位被替換。
+        """
+        # 策略一：預先建立「變數名 -> ${變數}」的對應字典 (用於鍵匹配)，一次查詢即可取得佔位符
+        key_placeholders = {variable: f"${{{variable}}}" for variable in csv_info.variable_names}
+        # 策略二：「值 -> ${變數}」的對應字典 (用於值匹配)
+        if value_to_placeholder_map is None:
+            value_to_placeholder_map = self._build_value_placeholder_map(csv_info)
+
+        # 只有在 INFO 等級會輸出時才記錄被替換的鍵和原因，以 set 邊走訪邊去除重複
+        track = self.logger.isEnabledFor(logging.INFO)
+        replacements_made = set()
+        changed = False
+
+        # 以明確的堆疊走訪物件並執行雙重替換策略 (避免遞迴的函式呼叫開銷與深度限制)
+        stack = [data_obj]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, dict):
+                # 使用 list(obj) 來避免在迭代期間修改字典的問題
+                for key in list(obj):
+                    value = obj[key]
+
+                    # --- 策略一：優先進行「鍵」匹配 ---
+                    placeholder = key_placeholders.get(key)
+                    if placeholder is not None:
+                        if value != placeholder:
+                            obj[key] = placeholder
+                            changed = True
+                            if track:
+                                replacements_made.add(f"'{key}' (鍵匹配)")
+                        # 鍵匹配成功後，跳過對該鍵值的後續處理
+                        continue
+
+                    # --- 如果是容器，則放入堆疊稍後處理 (不將整個子樹轉為字串做值匹配) ---
+                    if isinstance(value, (dict, list)):
+                        stack.append(value)
+                        continue
+
+                    # --- 策略二：如果鍵不匹配，則嘗試以純量值進行「值」匹配 ---
+                    if isinstance(value, str):
+                        placeholder = value_to_placeholder_map.get(value)
+                    elif isinstance(value, (int, float)):
+                        placeholder = value_to_placeholder_map.get(str(value))
+                    else:
+                        continue
+                    if placeholder is not None and value != placeholder:
+                        obj[key] = placeholder
+                        changed = True
+                        if track:
+                            replacements_made.add(f"'{key}' (值匹配)")
+
+            elif isinstance(obj, list):
+                stack.extend(obj)
+
+        if changed:
+            if track:
+                self.logger.info("JSON Body 參數化成功！已替換的欄位: %s", sorted(replacements_made))
+        else:
+            self.logger.warning(
+                "JSON Body 內容未發生變化。請檢查 JSON 的鍵名或值是否能對應到 CSV 的變數。")
+        return changed
+
     def _create_test_plan(self, context: GenerationContext):
         """
         建立 JMX 檔案的根節點 `<TestPlan>` 及其對應的 `<hashTree>`。
@@ -1089,15 +1482,16 @@ class JMXGeneratorService:
         :param name: 此標頭管理器的名稱。
         :return: 一個包含 HeaderManager XML 元素和其 hashTree 的元組。
         """
-        header_elements = []
-        for header in headers:
-            header_elements.append(
-                E.elementProp(
-                    E.stringProp(header.name, name="Header.name"),
-                    E.stringProp(header.value, name="Header.value"),
-                    name="", elementType="Header"
-                )
+        # E.xxx 每次屬性存取都會產生新的 partial 物件，先綁定為區域變數再於迴圈中使用
+        element_prop, string_prop = E.elementProp, E.stringProp
+        header_elements = [
+            element_prop(
+                string_prop(header.name, name="Header.name"),
+                string_prop(header.value, name="Header.value"),
+                name="", elementType="Header"
             )
+            for header in headers
+        ]
 
         element = E.HeaderManager(
             E.collectionProp(*header_elements, name="HeaderManager.headers"),
@@ -1182,7 +1576,7 @@ class JMXGeneratorService:
         element = E.CSVDataSet(
             E.stringProp(csv_info.delimiter, name="delimiter"),
             E.stringProp(csv_info.encoding, name="fileEncoding"),
-            E.stringProp(f"./{csv_info.filename}", name="filename"),
+            E.stringProp(_CSV_PATH_PREFIX + csv_info.filename, name="filename"),
             E.boolProp(str(csv_info.ignoreFirstLine).lower(), name="ignoreFirstLine"),
             E.boolProp(str(csv_info.quotedData).lower(), name="quotedData"),
             E.boolProp(str(csv_info.recycle).lower(), name="recycle"),
@@ -1206,14 +1600,15 @@ class JMXGeneratorService:
         :param json_body: 經過處理（可能已參數化）的請求 Body 字串。
         :return: 一個包含 HTTPSamplerProxy XML 元素和其 hashTree 的元組。
         """
-        escaped_body = saxutils.escape(json_body) if json_body else ""
+        # Body 以原始文字放入 lxml 節點，XML 跳脫由 lxml 序列化時一次完成，不可預先跳脫，否則會被重複跳脫
+        body_text = json_body or ""
         children = [
             E.boolProp("true", name="HTTPSampler.postBodyRaw"),
             E.elementProp(
                 E.collectionProp(
                     E.elementProp(
                         E.boolProp("false", name="HTTPArgument.always_encode"),
-                        E.stringProp(escaped_body, name="Argument.value"),
+                        E.stringProp(body_text, name="Argument.value"),
                         E.stringProp("=", name="Argument.metadata"),
                         name="", elementType="HTTPArgument"
                     ), name="Arguments.arguments"
@@ -1246,25 +1641,6 @@ class JMXGeneratorService:
         )
         return element, E.hashTree()
 
-    def _java_string_hashcode(self, text: str) -> int:
-        """
-        計算一個字串的雜湊碼，完全模擬 Java 的 String.hashCode() 行為。
-        這對於 JMeter 內部資料結構的正確性至關重要。
-        :param text: 輸入的字串。
-        :return: 一個 32 位元帶正負號的整數雜湊碼。
-        """
-        h = 0
-        # Java 的 hashCode 公式是 h = 31 * h + c
-        # 我們使用位元運算來將結果保持在 32 位元範圍內
-        for char in text:
-            h = (31 * h + ord(char)) & 0xFFFFFFFF
-
-        # 如果最高位 (第 32 位) 是 1，在二補數表示法中它是一個負數
-        if h & 0x80000000:
-            # 從 32 位元無符號整數轉換為 32 位元帶正負號整數
-            h = h - 0x100000000
-        return h
-
     def _create_response_assertion(self, assertion: AssertionInfo) -> tuple:
         """
         根據 `AssertionInfo` 物件建立 `<ResponseAssertion>` 元件。
@@ -1281,9 +1657,13 @@ class JMXGeneratorService:
 
         # 2. 準備 test_strings 集合
         # 使用自訂的 Java hashCode 函式，而不是 Python 內建的 hash()
+        # 迴圈外先綁定建構函式，避免每個樣式重複解析屬性
+        string_prop = E.stringProp
+        # 先一次過濾空值並轉為字串，讓建立元素的迴圈中不再有條件判斷與重複的 str() 呼叫
+        patterns = [str(p) for p in assertion.patterns if p]
         test_strings_props = [
-            E.stringProp(str(p), name=str(self._java_string_hashcode(str(p))))
-            for p in assertion.patterns if p
+            string_prop(p, name=str(_java_string_hashcode(p)))
+            for p in patterns
         ]
         # 【確認】collectionProp 的 name 屬性拼寫正確
         collection_prop = E.collectionProp(*test_strings_props, name="Asserion.test_strings")
@@ -1330,23 +1710,8 @@ class JMXGeneratorService:
             # JMeter 中，只記錄成功是透過一個獨立的 flag，而不是 error_logging 的反向
             collector_element.append(E.boolProp("true", name="ResultCollector.success_only_logging"))
 
-        # 3. 建立標準的 saveConfig 物件屬性，這定義了監聽器要儲存哪些欄位
-        save_config = E.objProp(
-            E.name("saveConfig"),
-            E.value(
-                E.time("true"), E.latency("true"), E.timestamp("true"),
-                E.success("true"), E.label("true"), E.code("true"),
-                E.message("true"), E.threadName("true"), E.dataType("true"),
-                E.encoding("false"), E.assertions("true"), E.subresults("true"),
-                E.responseData("false"), E.samplerData("false"), E.xml("false"),
-                E.fieldNames("true"), E.responseHeaders("false"), E.requestHeaders("false"),
-                E.responseDataOnError("false"), E.saveAssertionResultsFailureMessage("true"),
-                E.assertionsResultsToSave("0"), E.bytes("true"), E.sentBytes("true"),
-                E.url("true"), E.threadCounts("true"), E.idleTime("true"),
-                E.connectTime("true"),
-                **{'class': "SampleSaveConfiguration"}
-            )
-        )
+        # 3. 複製標準的 saveConfig 物件屬性，這定義了監聽器要儲存哪些欄位
+        save_config = copy.deepcopy(_SAVE_CONFIG_TEMPLATE)
         collector_element.append(save_config)
 
         # 4. 設定輸出檔案名稱
@@ -1360,12 +1725,32 @@ class JMXGeneratorService:
     def _assemble_jmx_from_structured_data(self, context: GenerationContext) -> str:
         """
         根據結構化的 Context 物件，組裝出最終的 JMX (XML) 字串。
+        :param context: 包含所有已解析和處理過的測試計畫資訊的 GenerationContext 物件。
+        :return: 一個包含完整 JMX 內容的字串。
+        """
+        root = self._build_jmx_tree(context)
+        return etree.tostring(root, pretty_print=True, xml_declaration=True, encoding='UTF-8').decode('utf-8')
+
+    def write_jmx_to(self, context: GenerationContext, fileobj) -> None:
+        """
+        將組裝好的 JMX 直接寫入檔案或二進位串流，不先在記憶體中產生完整字串。
+
+        適用於大型測試計畫需要落地成檔案的情境，lxml 會以緩衝方式分段寫出。
+        :param context: 包含所有已解析和處理過的測試計畫資訊的 GenerationContext 物件。
+        :param fileobj: 檔案路徑，或以二進位模式開啟的檔案物件 (例如 open(path, 'wb'))。
+        """
+        root = self._build_jmx_tree(context)
+        etree.ElementTree(root).write(fileobj, pretty_print=True, xml_declaration=True, encoding='UTF-8')
+
+    def _build_jmx_tree(self, context: GenerationContext) -> etree._Element:
+        """
+        根據結構化的 Context 物件，組裝出 JMX 的 lxml 元素樹。
 
         這是 JMX 的「組裝工廠」。它接收 `_prepare_generation_context` 產出的 `GenerationContext` 物件，
         然後遍歷其中的所有元件，呼叫對應的 `_create_*` 輔助函式來生成 XML 片段，
         並將它們按照正確的層級關係組裝起來。
         :param context: 包含所有已解析和處理過的測試計畫資訊的 GenerationContext 物件。
-        :return: 一個包含完整 JMX 內容的字串。
+        :return: JMX 的根元素 `<jmeterTestPlan>`。
         """
         self.logger.info("=== 開始執行 JMX 組裝流程 ===")
 
@@ -1395,12 +1780,10 @@ class JMXGeneratorService:
                     test_plan_hash_tree.append(rvc_ht)
 
         for tg_context in context.thread_groups:
-            self.logger.info(f"正在處理 ThreadGroup: {tg_context.name}")
-            self.logger.info(f"此 ThreadGroup 的 HTTP Requests 數量: {len(tg_context.http_requests)}")
-
             tg_element, tg_hash_tree = self._create_thread_group(tg_context)
             test_plan_hash_tree.append(tg_element)
             test_plan_hash_tree.append(tg_hash_tree)
+            assertion_count = 0
 
             if tg_context.headers:
                 header_manager_element, header_manager_ht = self._create_http_header_manager(tg_context.headers)
@@ -1421,18 +1804,18 @@ class JMXGeneratorService:
 
             if tg_context.http_requests:
                 for req_info in tg_context.http_requests:
-                    self.logger.info(f"  -> 正在組裝 HTTP Sampler: {req_info.name}")
+                    self.logger.debug("  -> 正在組裝 HTTP Sampler: %s", req_info.name)
 
                     # 步驟 1: 直接從 HttpRequestInfo 物件獲取 Body 內容
                     final_body_content = req_info.json_body or ""
 
                     # 步驟 2: 如果請求被標記為需要參數化，則呼叫參數化函式
                     if req_info.is_parameterized and tg_context.csv_data_sets:
-                        self.logger.info(f"    -> 請求 '{req_info.name}' 需要參數化，開始處理...")
+                        self.logger.debug("    -> 請求 '%s' 需要參數化，開始處理...", req_info.name)
                         for csv_info in tg_context.csv_data_sets:
                             final_body_content = self._parameterize_json_body(final_body_content, csv_info)
                     else:
-                        self.logger.info(f"    -> Body 來源: 靜態內容")
+                        self.logger.debug("    -> Body 來源: 靜態內容")
 
                     # 步驟 3: 將最終處理好的 Body 傳遞給建立函式
                     sampler_element, sampler_hash_tree = self._create_http_sampler_proxy(
@@ -1449,8 +1832,9 @@ class JMXGeneratorService:
                                 assertion_element, assertion_ht = self._create_response_assertion(assertion_info)
                                 sampler_hash_tree.append(assertion_element)
                                 sampler_hash_tree.append(assertion_ht)
+                                assertion_count += 1
                             else:
-                                self.logger.warning(f"因內容為空，已跳過生成名為 '{assertion_info.name}' 的斷言。")
+                                self.logger.warning("因內容為空，已跳過生成名為 '%s' 的斷言。", assertion_info.name)
 
             if tg_context.listeners:
                 for listener_info in tg_context.listeners:
@@ -1458,13 +1842,19 @@ class JMXGeneratorService:
                     tg_hash_tree.append(listener_element)
                     tg_hash_tree.append(listener_ht)
 
+            # 每個 ThreadGroup 只輸出一筆摘要，取代逐一元件的日誌
+            self.logger.info(
+                "  -> ThreadGroup '%s' 組裝完成: %d 個請求, %d 個斷言, %d 個 CSV",
+                tg_context.name, len(tg_context.http_requests), assertion_count, len(tg_context.csv_data_sets)
+            )
+
         for listener_info in context.listeners:
             listener_element, listener_ht = self._create_view_results_tree_listener(listener_info)
             test_plan_hash_tree.append(listener_element)
             test_plan_hash_tree.append(listener_ht)
 
         self.logger.info("JMX 元件組裝完成。")
-        return etree.tostring(root, pretty_print=True, xml_declaration=True, encoding='UTF-8').decode('utf-8')
+        return root
 
     async def convert_requirements_to_template(self, requirements: str, files_data: List[Dict] = None) -> str:
         """
@@ -1480,14 +1870,23 @@ class JMXGeneratorService:
 
         # 步驟 1: 建立一個專為此轉換任務設計的提示詞
         prompt = self._build_conversion_prompt(requirements, files_data)
-        self.logger.debug(f"建立的轉換提示詞:\n---\n{prompt}\n---")
+        self.logger.debug("建立的轉換提示詞:\n---\n%s\n---", prompt)
 
         try:
-            # 步驟 2: 呼叫 LLM 服務來執行轉換
-            self.logger.info("正在呼叫 LLM 進行轉換...")
-            response = self.llm_service.generate_text(prompt)
-            self.logger.info("LLM 回應接收成功。")
-            self.logger.debug(f"LLM 原始回應:\n---\n{response}\n---")
+            # 步驟 2: 呼叫 LLM 服務來執行轉換；完全相同的提示詞直接重用先前的回應，省去網路往返
+            # 快取鍵必須以送出的原始提示詞計算，空白/換行不同 (如斷言樣式、標頭值) 可能代表不同的需求
+            cache_key = hashlib.sha256(f"{self._model_name}\0{prompt}".encode('utf-8')).hexdigest()
+            response = self._llm_cache.get(cache_key)
+            if response is not None:
+                self.logger.info("使用快取的 LLM 回應，略過 LLM 呼叫。")
+            else:
+                self.logger.info("正在呼叫 LLM 進行轉換...")
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(self._executor, self.llm_service.generate_text, prompt)
+                if response:
+                    self._llm_cache.put(cache_key, response)
+                self.logger.info("LLM 回應接收成功。")
+            self.logger.debug("LLM 原始回應:\n---\n%s\n---", response)
 
             # 步驟 3: 清理 LLM 的回應，移除可能的多餘部分 (如 markdown)
             template_str = self._clean_llm_template_response(response)
@@ -1496,23 +1895,11 @@ class JMXGeneratorService:
             return template_str
 
         except Exception as e:
-            self.logger.error(f"在使用 LLM 轉換需求時發生錯誤: {e}", exc_info=True)
+            self.logger.error("在使用 LLM 轉換需求時發生錯誤: %s", e, exc_info=True)
             raise RuntimeError(f"無法將需求轉換為模板: {e}")
 
-    def _build_conversion_prompt(self, requirements: str, files_data: List[Dict] = None) -> str:
-        """
-        建立用於指導 LLM 進行需求轉換的提示詞 (Prompt)。
-
-        這是「提示詞工程」的核心，負責動態產生一段詳細的文字，指導 LLM 如何工作。
-        它包含了角色設定、核心規則、任務描述和輸出範例。
-        :param requirements: 使用者輸入的自然語言需求。
-        :param files_data: 一個包含已上傳檔案資訊的字典列表。
-        :return: 完整的提示詞字串。
-        """
-        attached_files = [f.get('filename', f.get('name', '')) for f in files_data if f] if files_data else []
-        files_context = "\n".join([f"- `{name}`" for name in attached_files]) if attached_files else "無"
-
-        prompt = textwrap.dedent(f"""
+    # 需求轉換提示詞的原始模板 (保留原始碼縮排)
+    _CONVERSION_PROMPT_SOURCE = """
         [INST]
         <<SYS>>
         您是一位精通 JMeter 的專家助理。您的唯一任務是將用戶提供的自然語言需求，精確地轉換為指定的結構化文字模板格式。
@@ -1606,52 +1993,42 @@ class JMXGeneratorService:
         log_errors_only = true
         ```
         [/INST]
-        """)
+    """
+    # 類別載入時只 dedent 一次，每次呼叫僅以 str.format 填入需求與檔案列表
+    _CONVERSION_PROMPT_TEMPLATE = textwrap.dedent(_CONVERSION_PROMPT_SOURCE)
+
+    def _build_conversion_prompt(self, requirements: str, files_data: List[Dict] = None) -> str:
+        """
+        建立用於指導 LLM 進行需求轉換的提示詞 (Prompt)。
+
+        這是「提示詞工程」的核心，負責動態產生一段詳細的文字，指導 LLM 如何工作。
+        它包含了角色設定、核心規則、任務描述和輸出範例。
+        :param requirements: 使用者輸入的自然語言需求。
+        :param files_data: 一個包含已上傳檔案資訊的字典列表。
+        :return: 完整的提示詞字串。
+        """
+        attached_files = [f.get('filename', f.get('name', '')) for f in files_data if f] if files_data else []
+        files_context = "\n".join([f"- `{name}`" for name in attached_files]) if attached_files else "無"
+
+        # 填入的值為單行且非空白時，先 dedent 再填入與填入後再 dedent 的結果完全相同，可直接使用預先 dedent 的模板；
+        # 多行 (例如上傳多個檔案) 或空白的值會影響 dedent 的結果，此時仍對填入後的完整提示詞 dedent，確保送給 LLM 的內容不變
+        if any('\n' in value or not value.strip() for value in (requirements, files_context)):
+            return textwrap.dedent(
+                self._CONVERSION_PROMPT_SOURCE.format(requirements=requirements, files_context=files_context))
+        prompt = self._CONVERSION_PROMPT_TEMPLATE.format(requirements=requirements, files_context=files_context)
         return prompt
 
     def _clean_llm_template_response(self, response: str) -> str:
         """
         清理 LLM 返回的模板字串，移除常見的多餘部分。
+
+        實際的字串處理委派給模組層級、帶有 LRU 快取的 `_clean_llm_template_response_impl`，
+        相同的回應內容在重複生成時不會再被重新掃描。
         :param response: 來自 LLM 的原始回應字串。
         :return: 清理後的模板字串。
         """
-        # 尋找模板的起始標誌
-        start_marker = "# ======================================================================"
-        start_index = response.find(start_marker)
-
-        if start_index == -1:
-            # 如果找不到起始標誌，嘗試尋找第一個 [Component: Name]
-            match = re.search(r"^\s*\[[a-zA-Z]+:.+?\]", response, re.MULTILINE)
-            if match:
-                start_index = match.start()
-            else:
-                self.logger.warning("在 LLM 回應中找不到模板起始標誌，返回原始回應。")
-                return response.strip()
-
-        # 從找到的起始位置截取
-        cleaned_response = response[start_index:]
-
-        # 移除結尾可能出現的 markdown
-        if cleaned_response.endswith("```"):
-            cleaned_response = cleaned_response[:-3].strip()
-
+        cleaned_response = _clean_llm_template_response_impl(response)
+        if cleaned_response is None:
+            self.logger.warning("在 LLM 回應中找不到模板起始標誌，返回原始回應。")
+            return response.strip()
         return cleaned_response
-
-    def _java_string_hashcode(self, text: str) -> int:
-        """
-        計算一個字串的雜湊碼，完全模擬 Java 的 String.hashCode() 行為。
-        這對於 JMeter 內部資料結構的正確性至關重要。
-        :param text: 輸入的字串。
-        :return: 一個 32 位元帶正負號的整數雜湊碼。
-        """
-        h = 0
-        # Java 的 hashCode 公式是 h = 31 * h + c
-        # 我們使用位元運算來將結果保持在 32 位元範圍內
-        for char in text:
-            h = (31 * h + ord(char)) & 0xFFFFFFFF
-
-        # 如果最高位 (第 32 位) 是 1，在二補數表示法中它是一個負數
-        if h & 0x80000000:
-            # 從 32 位元無符號整數轉換為 32 位元帶正負號整數
-            h = h - 0x100000000
-        return h
\ No newline at end of file
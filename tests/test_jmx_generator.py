@@ -0,0 +1,70 @@
+"""
+JMXGeneratorService 的單元測試
+"""
+import pytest
+from backend.services.jmx_generator import JMXGeneratorService, CsvInfo
+
+
+@pytest.fixture
+def jmx_service():
+    """建立不連線 LLM 的 JMXGeneratorService"""
+    service = JMXGeneratorService(llm_service=object())
+    yield service
+    service.close()
+
+
+class TestValidateXml:
+    """validate_xml 的測試"""
+
+    @pytest.mark.parametrize("prolog", [
+        "<!-- generated -->",
+        '<?xml-stylesheet type="text/xsl" href="style.xsl"?>',
+    ])
+    def test_root_preceded_by_comment_or_pi(self, jmx_service, prolog):
+        """根元素前有註解或處理指令時仍應通過驗證"""
+        xml = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'{prolog}\n'
+            '<jmeterTestPlan><hashTree><a/><b/></hashTree></jmeterTestPlan>'
+        )
+        is_valid, message = jmx_service.validate_xml(xml)
+        assert is_valid, message
+
+    def test_sample_jmx_content(self, jmx_service, sample_jmx_content):
+        """基本的 JMX 內容應通過驗證"""
+        is_valid, message = jmx_service.validate_xml(sample_jmx_content)
+        assert is_valid, message
+
+    def test_malformed_xml(self, jmx_service):
+        """標籤不成對時應驗證失敗"""
+        xml = '<?xml version="1.0"?>\n<jmeterTestPlan><hashTree><a></b></hashTree></jmeterTestPlan>'
+        is_valid, _ = jmx_service.validate_xml(xml)
+        assert not is_valid
+
+    @pytest.mark.parametrize("trailing", ["\u00a0", "\u3000", "\n\u3000\u00a0"])
+    def test_trailing_unicode_whitespace(self, jmx_service, trailing):
+        """結尾的 Unicode 空白 (如 NBSP、全形空白) 不應影響驗證結果"""
+        xml = '<?xml version="1.0"?>\n<jmeterTestPlan><hashTree/></jmeterTestPlan>' + trailing
+        is_valid, message = jmx_service.validate_xml(xml)
+        assert is_valid, message
+
+
+class TestParameterizeJsonBody:
+    """_parameterize_json_body 的測試"""
+
+    @staticmethod
+    def _csv_info(raw_content, variable_names):
+        return CsvInfo(name="CSV Data Set Config", filename="data.csv",
+                       variable_names=variable_names, raw_content=raw_content)
+
+    def test_unmatched_body_is_returned_verbatim(self, jmx_service):
+        """沒有任何欄位被替換時，應原樣返回 Body 而不重新排版"""
+        body = '{ "path": "a\\\\b",  "n": 1 }'
+        csv_info = self._csv_info("status\nok\n", ["status"])
+        assert jmx_service._parameterize_json_body(body, csv_info) == body
+
+    def test_key_and_value_match(self, jmx_service):
+        """鍵匹配與值匹配皆應替換為 CSV 變數"""
+        body = '{"type": "A", "other": "X123"}'
+        csv_info = self._csv_info("type,ID\nA,X123\n", ["type", "ID"])
+        assert jmx_service._parameterize_json_body(body, csv_info) == '{"type":"${type}","other":"${ID}"}'